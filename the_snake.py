@@ -1,6 +1,7 @@
 import pygame
 import os
-from random import choice
+from collections import deque
+from random import choice, randrange
 
 HIGH_SCORE_FILE = 'highscore.txt'
 
@@ -20,9 +21,19 @@ def load_high_score():
 
 
 def save_high_score(score):
-    """Сохраняет рекорд в файл."""
-    with open(HIGH_SCORE_FILE, 'w') as file:
+    """
+    Сохраняет рекорд в файл.
+    Запись идёт во временный файл, который затем атомарно заменяет
+    основной, поэтому сбой во время записи не портит прежний рекорд.
+    """
+    tmp_file = HIGH_SCORE_FILE + '.tmp'
+    with open(tmp_file, 'w') as file:
         file.write(str(score))
+    os.replace(tmp_file, HIGH_SCORE_FILE)
+
+
+# Рекорд кэшируется в памяти: файл читается один раз при запуске
+_HIGH_SCORE = load_high_score()
 
 
 # Константы для размеров поля и сетки
@@ -32,15 +43,30 @@ GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 INFO_BAR_HEIGHT = 40
 
-ALL_CELLS = set((x * GRID_SIZE, y * GRID_SIZE)
-                for x in range(GRID_WIDTH)
-                for y in range(GRID_HEIGHT))
-
-# Направления движения
-UP = (0, -1)
-DOWN = (0, 1)
-LEFT = (-1, 0)
-RIGHT = (1, 0)
+# Все клетки поля вычисляются один раз и не меняются
+ALL_CELLS_TUPLE = tuple((x * GRID_SIZE, y * GRID_SIZE)
+                        for x in range(GRID_WIDTH)
+                        for y in range(GRID_HEIGHT))
+ALL_CELLS = frozenset(ALL_CELLS_TUPLE)
+ALL_CELLS_INDEX = {cell: i for i, cell in enumerate(ALL_CELLS_TUPLE)}
+
+# Направления движения (смещение за один ход в пикселях)
+UP = (0, -GRID_SIZE)
+DOWN = (0, GRID_SIZE)
+LEFT = (-GRID_SIZE, 0)
+RIGHT = (GRID_SIZE, 0)
+
+# Клавиши управления: новое направление и изменение скорости
+DIRECTION_KEYS = {
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT
+}
+SPEED_KEYS = {
+    pygame.K_q: 2,
+    pygame.K_w: -2
+}
 
 # Цвета
 BOARD_BACKGROUND_COLOR = (0, 0, 0)
@@ -61,17 +87,90 @@ screen = pygame.display.set_mode(
 pygame.display.set_caption('Змейка')
 clock = pygame.time.Clock()
 
+# Области экрана: информационная строка сверху, под ней игровое поле
+INFO_BAR_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, INFO_BAR_HEIGHT)
+BOARD_RECT = pygame.Rect(0, INFO_BAR_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT)
+
 # Инициализация шрифтов
 pygame.font.init()
 font = pygame.font.SysFont('Arial', 24)
 
 
-def get_available_positions(snake_positions):
+def make_cell_surface(color):
+    """Создаёт поверхность клетки заданного цвета с рамкой."""
+    surface = pygame.Surface((GRID_SIZE, GRID_SIZE)).convert()
+    surface.fill(color)
+    pygame.draw.rect(surface, BORDER_COLOR, surface.get_rect(), 1)
+    return surface
+
+
+# Заранее отрисованные клетки: вывод клетки сводится к одному blit
+_cell_surfaces = {
+    color: make_cell_surface(color)
+    for color in (SNAKE_COLOR, APPLE_COLOR, BAD_FOOD_COLOR, OBSTACLE_COLOR)
+}
+
+
+def cell_rect(position):
+    """Возвращает прямоугольник клетки поля в координатах экрана."""
+    return pygame.Rect((position[0], position[1] + INFO_BAR_HEIGHT),
+                       (GRID_SIZE, GRID_SIZE))
+
+
+def erase_cell(position):
+    """Закрашивает клетку цветом фона и возвращает её прямоугольник."""
+    rect = cell_rect(position)
+    screen.fill(BOARD_BACKGROUND_COLOR, rect)
+    return rect
+
+
+class FreeCells:
     """
-    Возвращает множество свободных позиций на поле,
-    исключая занятые телом змеи.
+    Множество свободных клеток поля, обновляемое по ходу игры.
+    Клетки хранятся в списке с индексом позиций, поэтому добавление,
+    удаление и выбор случайной клетки выполняются за O(1).
     """
-    return ALL_CELLS - set(snake_positions)
+
+    def __init__(self):
+        self.cells = list(ALL_CELLS_TUPLE)
+        self.index = ALL_CELLS_INDEX.copy()
+
+    def add(self, cell):
+        """Помечает клетку свободной."""
+        if cell not in self.index:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        """Помечает клетку занятой, меняя её местами с последней."""
+        i = self.index.pop(cell, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.index[last] = i
+
+    def choice(self):
+        """Возвращает случайную свободную клетку."""
+        return choice(self.cells)
+
+    def take(self):
+        """Занимает случайную свободную клетку и возвращает её."""
+        cell = self.choice()
+        self.discard(cell)
+        return cell
+
+
+def get_random_position(free_cells=None):
+    """
+    Выбирает случайную свободную позицию на поле и помечает её занятой.
+    Если свободные клетки не переданы, всё поле считается пустым.
+    """
+    if free_cells is None:
+        return (randrange(GRID_WIDTH) * GRID_SIZE,
+                randrange(GRID_HEIGHT) * GRID_SIZE)
+    return free_cells.take()
 
 
 class GameObject:
@@ -82,68 +181,78 @@ class GameObject:
         self.body_color = color
 
     def draw(self):
-        """Отрисовка объекта на текущей позиции."""
-        self.draw_at_position(self.position, self.body_color)
+        """
+        Отрисовка объекта на текущей позиции.
+        Возвращает прямоугольник перерисованной клетки.
+        """
+        return self.draw_at_position(self.position, self.body_color)
 
     @staticmethod
     def draw_at_position(position, color):
-        """Отрисовка объекта на заданной позиции."""
-        rect = pygame.Rect(position, (GRID_SIZE, GRID_SIZE))
-        pygame.draw.rect(screen, color, rect)
-        pygame.draw.rect(screen, BORDER_COLOR, rect, 1)
+        """
+        Отрисовка объекта на заданной позиции.
+        Возвращает прямоугольник перерисованной клетки.
+        """
+        surface = _cell_surfaces.get(color)
+        if surface is None:
+            surface = _cell_surfaces[color] = make_cell_surface(color)
+        return screen.blit(surface, (position[0],
+                                     position[1] + INFO_BAR_HEIGHT))
 
 
 class Apple(GameObject):
     """Класс для яблока."""
 
-    def __init__(self, snake_positions=[]):
-        self.randomize_position(snake_positions)
+    def __init__(self, free_cells=None):
+        self.randomize_position(free_cells)
         super().__init__(self.position, APPLE_COLOR)
 
-    def randomize_position(self, snake_positions):
+    def randomize_position(self, free_cells=None):
         """
         Генерация случайной позиции для яблока,
-        исключая занятые клетки змеи.
+        исключая занятые клетки поля.
         """
-        available_positions = get_available_positions(snake_positions)
-        self.position = choice(list(available_positions))
+        self.position = get_random_position(free_cells)
 
 
 class BadFood(GameObject):
     """Класс для неправильной еды."""
 
-    def __init__(self, snake_positions=[]):
-        self.randomize_position(snake_positions)
+    def __init__(self, free_cells=None):
+        self.randomize_position(free_cells)
         super().__init__(self.position, BAD_FOOD_COLOR)
 
-    def randomize_position(self, snake_positions):
+    def randomize_position(self, free_cells=None):
         """Генерация случайной позиции для неправильной еды."""
-        available_positions = get_available_positions(snake_positions)
-        self.position = choice(list(available_positions))
+        self.position = get_random_position(free_cells)
 
 
 class Obstacle(GameObject):
     """Класс для препятствий."""
 
-    def __init__(self, snake_positions=[]):
-        self.randomize_position(snake_positions)
+    def __init__(self, free_cells=None):
+        self.randomize_position(free_cells)
         super().__init__(self.position, OBSTACLE_COLOR)
 
-    def randomize_position(self, snake_positions):
+    def randomize_position(self, free_cells=None):
         """Генерация случайной позиции для препятствия."""
-        available_positions = get_available_positions(snake_positions)
-        self.position = choice(list(available_positions))
+        self.position = get_random_position(free_cells)
 
 
 class Snake(GameObject):
     """Класс для змейки, наследующийся от GameObject."""
 
-    def __init__(self):
+    def __init__(self, free_cells=None):
         self.length = 1
-        self.positions = [((SCREEN_WIDTH // 2), (SCREEN_HEIGHT // 2))]
+        self.positions = deque([((SCREEN_WIDTH // 2), (SCREEN_HEIGHT // 2))])
+        self._occupied = set(self.positions)
         self.direction = RIGHT
         self.next_direction = None
         self.last = None
+        if free_cells is None:
+            free_cells = FreeCells()
+        free_cells.discard(self.positions[0])
+        self.free_cells = free_cells
         super().__init__(self.positions[0], SNAKE_COLOR)
 
     def get_head_position(self):
@@ -159,67 +268,103 @@ class Snake(GameObject):
     def move(self):
         """Двигает змейку в соответствии с текущим направлением."""
         cur = self.get_head_position()
-        x, y = self.direction
-        new = ((cur[0] + (x * GRID_SIZE)) % SCREEN_WIDTH,
-               (cur[1] + (y * GRID_SIZE)) % SCREEN_HEIGHT)
+        dx, dy = self.direction
+        new = ((cur[0] + dx) % SCREEN_WIDTH, (cur[1] + dy) % SCREEN_HEIGHT)
+
+        positions = self.positions
+        occupied = self._occupied
+        free_cells = self.free_cells
 
-        if new in self.positions[1:]:
+        # Если змейка не растёт, хвост освобождает клетку в этот же ход
+        if len(positions) >= self.length:
+            tail = positions[-1]
+        else:
+            tail = None
+
+        if new in occupied and new != tail:
             self.reset()
         else:
-            self.positions.insert(0, new)
-            if len(self.positions) > self.length:
-                self.last = self.positions.pop()
-            else:
-                self.last = None
+            self.last = tail
+            if tail is not None:
+                positions.pop()
+                occupied.discard(tail)
+                free_cells.add(tail)
+            positions.appendleft(new)
+            occupied.add(new)
+            free_cells.discard(new)
 
         self.position = self.positions[0]
 
+    def shrink(self):
+        """
+        Укорачивает змейку на один сегмент с хвоста.
+        Возвращает освободившуюся клетку или None.
+        """
+        self.length -= 1
+        if len(self.positions) > self.length:
+            tail = self.positions.pop()
+            self._occupied.discard(tail)
+            self.free_cells.add(tail)
+            return tail
+        return None
+
     def reset(self):
         """Сброс состояния змейки при столкновении с собой или препятствием."""
-        self.__init__()
+        for position in self.positions:
+            self.free_cells.add(position)
+        self.__init__(self.free_cells)
+
+    def draw_head(self):
+        """
+        Отрисовывает только голову змейки.
+        Остальные сегменты с прошлого кадра не меняются.
+        """
+        return self.draw_at_position(self.positions[0], self.body_color)
 
     def draw(self):
         """Отрисовывает змейку на игровом поле."""
+        draw = GameObject.draw_at_position
+        color = self.body_color
         for position in self.positions:
-            GameObject.draw_at_position(position, self.body_color)
+            draw(position, color)
 
 
 def handle_keys(snake, current_speed):
     """Обрабатывает нажатия клавиш."""
-    # Словарь для сопоставления клавиш с новыми направлениями
-    direction_map = {
-        pygame.K_UP: UP,
-        pygame.K_DOWN: DOWN,
-        pygame.K_LEFT: LEFT,
-        pygame.K_RIGHT: RIGHT
-    }
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
+    # Прочие события (например, WINDOWEXPOSED) остаются в очереди для main
+    for event in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
+        if event.type == pygame.QUIT or event.key == pygame.K_ESCAPE:
             pygame.quit()
             raise SystemExit
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                pygame.quit()
-                raise SystemExit
-            elif event.key == pygame.K_q:
-                current_speed += 2
-            elif event.key == pygame.K_w:
-                current_speed = max(1, current_speed - 2)
-            else:
-                # Получаем новое направление из словаря
-                new_direction = direction_map.get(event.key)
-                snake.next_direction = new_direction
+        if event.key in SPEED_KEYS:
+            current_speed = max(1, current_speed + SPEED_KEYS[event.key])
+        elif event.key in DIRECTION_KEYS:
+            snake.next_direction = DIRECTION_KEYS[event.key]
 
     return current_speed
 
 
-def draw_info_bar(snake_length, current_speed):
-    """Отрисовывает информационную строку над игровым полем."""
-    text = f"Length: {snake_length} | Speed: {current_speed}"
-    info_surface = font.render(text, True, INFO_TEXT_COLOR)
-    screen.fill((0, 0, 0), (0, 0, SCREEN_WIDTH, INFO_BAR_HEIGHT))
-    screen.blit(info_surface, (10, 10))
+# Последняя отрисованная информационная строка: текст меняется редко,
+# поэтому повторно растеризуем его только при изменении длины или скорости
+_info_cache = {'key': None, 'surface': None}
+
+
+def draw_info_bar(snake_length, current_speed, redraw=False):
+    """
+    Отрисовывает информационную строку над игровым полем.
+    При redraw строка выводится из кэша, даже если не изменилась.
+    Возвращает её прямоугольник или None, если строка не изменилась.
+    """
+    key = (snake_length, current_speed)
+    if key != _info_cache['key']:
+        text = f"Length: {snake_length} | Speed: {current_speed}"
+        _info_cache['surface'] = font.render(text, True, INFO_TEXT_COLOR)
+        _info_cache['key'] = key
+    elif not redraw:
+        return None
+    screen.fill((0, 0, 0), INFO_BAR_RECT)
+    screen.blit(_info_cache['surface'], (10, 10))
+    return INFO_BAR_RECT
 
 
 def change_title(snake_length):
@@ -227,58 +372,117 @@ def change_title(snake_length):
     Обновляет заголовок окна с рекордом,
     если текущая длина змейки больше рекорда.
     """
-    high_score = load_high_score()
-    if snake_length > high_score:
+    global _HIGH_SCORE
+    if snake_length > _HIGH_SCORE:
         save_high_score(snake_length)
-        pygame.display.set_caption(f'Змейка (Рекорд: {snake_length})')
-    else:
-        pygame.display.set_caption(f'Змейка (Рекорд: {high_score})')
+        _HIGH_SCORE = snake_length
+    pygame.display.set_caption(f'Змейка (Рекорд: {_HIGH_SCORE})')
+
+
+def kill_snake(snake):
+    """
+    Сбрасывает погибшую змейку.
+    Заголовок окна обновляется, только если побит рекорд.
+    """
+    if snake.length > _HIGH_SCORE:
+        change_title(snake.length)
+    snake.reset()
+
+
+def clear_start_cell(snake, free_cells, *items):
+    """
+    Переносит объекты с клетки, где змейка появилась после сброса.
+    Иначе объект остался бы под змейкой и стёрся бы вместе с её хвостом.
+    """
+    head = snake.positions[0]
+    for item in items:
+        if item.position == head:
+            item.randomize_position(free_cells)
+
+
+def redraw_board(snake, *items):
+    """Перерисовывает игровое поле целиком."""
+    screen.fill(BOARD_BACKGROUND_COLOR, BOARD_RECT)
+    for item in items:
+        item.draw()
+    snake.draw()
 
 
 def main():
     """Основная игровая логика."""
     pygame.init()
-
-    snake = Snake()
-    apple = Apple(snake.positions)
-    bad_food = BadFood(snake.positions)
-    obstacle = Obstacle(snake.positions)
+    # В очередь попадают только клавиши, выход и перерисовка окна
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN,
+                              pygame.WINDOWEXPOSED])
+
+    # Общие для всех объектов свободные клетки: еда и препятствие
+    # не появляются ни на змейке, ни друг на друге
+    free_cells = FreeCells()
+    snake = Snake(free_cells)
+    apple = Apple(free_cells)
+    bad_food = BadFood(free_cells)
+    obstacle = Obstacle(free_cells)
     current_speed = SPEED
     change_title(snake.length)
 
+    # Локальные ссылки избавляют цикл от повторного поиска атрибутов
+    tick = clock.tick
+    update_display = pygame.display.update
+
+    draw_info_bar(snake.length, current_speed)
+    redraw_board(snake, apple, bad_food, obstacle)
+    update_display()
+
     while True:
-        clock.tick(current_speed)
+        tick(current_speed)
         current_speed = handle_keys(snake, current_speed)
+        exposed = pygame.event.get(pygame.WINDOWEXPOSED, pump=False)
         snake.update_direction()
+        body = snake.positions
         snake.move()
+        head = snake.positions[0]
+
+        # Перерисовываем и обновляем на экране только изменившиеся клетки
+        dirty = []
+        if snake.last is not None:
+            dirty.append(erase_cell(snake.last))
 
-        if snake.get_head_position() == apple.position:
+        if head == apple.position:
             snake.length += 1
-            apple.randomize_position(snake.positions)
+            apple.randomize_position(free_cells)
+            dirty.append(apple.draw())
 
-        if snake.get_head_position() == bad_food.position:
+        # Объект переносится до сброса змейки: reset() возвращает клетки
+        # тела в свободные, и клетка объекта не должна попасть туда раньше
+        if head == bad_food.position:
+            bad_food.randomize_position(free_cells)
             if snake.length > 1:
-                snake.length -= 1
-                snake.positions.pop()
+                tail = snake.shrink()
+                if tail is not None:
+                    dirty.append(erase_cell(tail))
             else:
-                change_title(snake.length)
-                snake.reset()
-            bad_food.randomize_position(snake.positions)
-
-        if snake.get_head_position() == obstacle.position:
-            change_title(snake.length)
-            snake.reset()
-            obstacle.randomize_position(snake.positions)
-
-        screen.fill(BOARD_BACKGROUND_COLOR,
-                    (0, INFO_BAR_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT)
-                    )
-        draw_info_bar(snake.length, current_speed)
-        apple.draw()
-        bad_food.draw()
-        obstacle.draw()
-        snake.draw()
-        pygame.display.update()
+                kill_snake(snake)
+            dirty.append(bad_food.draw())
+
+        if head == obstacle.position:
+            obstacle.randomize_position(free_cells)
+            kill_snake(snake)
+            dirty.append(obstacle.draw())
+
+        # reset() создаёт новое тело: после сброса поле обновляется целиком,
+        # как и после того, как окно было перекрыто и снова открылось
+        full_redraw = exposed or snake.positions is not body
+        info_rect = draw_info_bar(snake.length, current_speed, full_redraw)
+        if info_rect is not None:
+            dirty.append(info_rect)
+        if full_redraw:
+            clear_start_cell(snake, free_cells, apple, bad_food, obstacle)
+            redraw_board(snake, apple, bad_food, obstacle)
+            update_display()
+        else:
+            dirty.append(snake.draw_head())
+            update_display(dirty)
 
 
 if __name__ == '__main__':